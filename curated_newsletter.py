@@ -1,21 +1,355 @@
 import os
+import html
+import shutil
 import tempfile
+import time
 import uuid
+import hashlib
 import smtplib
+import queue
+import threading
 import re
+import string
 import logging
 import requests
+import filetype
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.parse import urlsplit
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from exa_py import Exa
-from typing import List, Dict, Any, Optional, Union
+from PIL import Image
+from typing import List, Dict, Any, Optional, Tuple, Union
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Load .env once at import so LOG_LEVEL, EXA_API_KEY etc. are visible below
+load_dotenv()
+
+# Configure logging; set LOG_LEVEL=DEBUG to see per-result details. Numeric
+# levels are accepted and unknown names fall back to INFO instead of
+# failing at import
+_LOG_LEVEL_NAME = (os.getenv('LOG_LEVEL') or 'INFO').strip().upper()
+_LOG_LEVEL = int(_LOG_LEVEL_NAME) if _LOG_LEVEL_NAME.isdigit() else logging.getLevelName(_LOG_LEVEL_NAME)
+_LOG_LEVEL_KNOWN = isinstance(_LOG_LEVEL, int)
+logging.basicConfig(level=_LOG_LEVEL if _LOG_LEVEL_KNOWN else logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
+if not _LOG_LEVEL_KNOWN:
+    logger.warning(f"Unknown LOG_LEVEL {_LOG_LEVEL_NAME!r}, using INFO")
+
+# Upper bound on concurrent image downloads per newsletter
+MAX_DOWNLOAD_WORKERS = 8
+
+# Images are streamed to disk in chunks of this size
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Larger images are not downloaded at all
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+
+# Header length filetype needs to recognise any supported image format
+IMAGE_SNIFF_BYTES = 261
+
+# How long images in IMAGE_CACHE_DIR are reused before being fetched again
+IMAGE_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Inline images are resized to the newsletter column width before attaching
+MAX_IMAGE_WIDTH = 800
+JPEG_QUALITY = 80
+
+# Characters of the article text shown under each summary
+EXCERPT_PREVIEW_LENGTH = 300
+
+# Sent with every image request; some CDNs reject the default python-requests agent
+USER_AGENT = 'Mozilla/5.0 (compatible; CuratedNewsletter/1.0)'
+
+# Outgoing mail server and connection pool limits
+SMTP_HOST = 'smtp.gmail.com'
+SMTP_PORT = 587
+SMTP_TIMEOUT = 30
+SMTP_POOL_SIZE = 5
+SMTP_MAX_MESSAGES_PER_CONN = 100
+
+# Exa responses are reused for identical searches within this window
+SEARCH_CACHE_TTL = 15 * 60
+SEARCH_CACHE_SIZE = 256
+
+# Patterns used on every search result, compiled once at import
+_HTML_TAG_RE = re.compile(r'<[^<]+?>')
+_LOADING_RE = re.compile(r'please wait|being verified|loading', re.IGNORECASE)
+_ABOUT_RE = re.compile(r'about\s+([^\.]+)', re.IGNORECASE)
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+# Alternatives are bold, italics and code; the group number selects the tag
+_MARKDOWN_RE = re.compile(r'\*([^*]+)\*|_([^_]+)_|`([^`]+)`')
+_MARKDOWN_TAGS = (None, 'strong', 'em', 'code')
+
+# Names download_image gives cached images and their in-progress downloads
+_CACHED_IMAGE_RE = re.compile(r'[0-9a-f]{40}\.jpg(?:\.[0-9a-f]{32}\.part)?$')
+
+# Stylesheet embedded in every newsletter; built once at import
+NEWSLETTER_CSS = '''
+        body { font-family: Arial, sans-serif; line-height: 1.6; max-width: 800px; margin: 0 auto; padding: 20px; }
+        h1 { color: #333; text-align: center; border-bottom: 2px solid #f0f0f0; padding-bottom: 10px; }
+        .date { color: #666; font-size: 0.9em; text-align: center; margin-bottom: 20px; }
+        .news-item { margin-bottom: 30px; padding: 20px; background: #f9f9f9; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+        .news-item h2 { color: #2a5db0; margin-top: 0; }
+        .news-item .excerpt { color: #444; margin: 10px 0; line-height: 1.5; }
+        .news-item .summary { color: #333; margin: 15px 0; background: #f0f0f0; padding: 10px; border-left: 3px solid #2a5db0; }
+        .news-item .source { color: #666; font-size: 0.9em; margin-top: 10px; }
+        .news-item img { max-width: 100%; height: auto; border-radius: 4px; margin: 10px 0; }
+        .category-header { margin: 30px 0 20px; padding: 15px; background: #e9f0f7; border-radius: 8px; text-align: center; }
+        .category-header h2 { color: #333; margin: 0; }
+        a { color: #2a5db0; text-decoration: none; }
+        a:hover { text-decoration: underline; }
+'''
+
+# Page shell around the item cards; the stylesheet is inlined once at import
+_PAGE_TEMPLATE = string.Template('''
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Curated Newsletter</title>
+    <style>''' + NEWSLETTER_CSS + '''    </style>
+</head>
+<body>
+    <h1>Curated Newsletter</h1>
+    <div class="date">$date</div>
+    <div class="category-header">
+        <h2>Today's Insights: $query</h2>
+    </div>
+    $items
+</body>
+</html>
+''')
+
+# Card markup for a single newsletter item, filled in with str.format
+_ITEM_TEMPLATE = '''
+    <div class="news-item">
+        <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 12px;">
+            <div style="display: flex; align-items: center; justify-content: center; width: 24px; height: 24px;">
+                <img src="{favicon}" alt="favicon" style="width: 16px; height: 16px; border-radius: 4px; object-fit: contain; display: block;">
+            </div>
+            <h2 style="margin: 0; font-size: 1.2em; line-height: 1.2;">{title}</h2>
+        </div>
+        <div class="summary">{summary}</div>
+        <p class="excerpt">{excerpt}</p>
+        <div class="source">Source: <a href='{source}' target="_blank">{source}</a></div>
+        {image_html}
+    </div>
+    '''
+
+
+def _markdown_to_html(match: "re.Match[str]") -> str:
+    """
+    Replace one Markdown span matched by _MARKDOWN_RE with its HTML tag.
+    
+    Bold and italic bodies are processed again so nested spans still convert;
+    code bodies are left verbatim.
+    
+    Args:
+        match: Match of _MARKDOWN_RE
+        
+    Returns:
+        HTML for the span
+    """
+    tag = _MARKDOWN_TAGS[match.lastindex]
+    body = match.group(match.lastindex)
+    if tag != 'code':
+        body = _MARKDOWN_RE.sub(_markdown_to_html, body)
+    return f'<{tag}>{body}</{tag}>'
+
+
+class SMTPPool:
+    """
+    A small pool of logged-in SMTP connections shared across newsletter sends.
+    
+    Opening a connection costs a TCP connect, STARTTLS and AUTH; reusing one
+    turns every send after the first into only the MAIL/RCPT/DATA exchange.
+    """
+    
+    def __init__(self, host: str, port: int, user: str, password: str,
+                 max_size: int = SMTP_POOL_SIZE, max_messages_per_conn: int = SMTP_MAX_MESSAGES_PER_CONN):
+        """
+        Initialize the pool.
+        
+        Args:
+            host: SMTP server host
+            port: SMTP server port (STARTTLS)
+            user: Login user name
+            password: Login password
+            max_size: Maximum number of connections open at once
+            max_messages_per_conn: Messages sent on a connection before it is replaced
+        """
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.max_messages_per_conn = max_messages_per_conn
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue()
+        self._sent_counts: Dict[smtplib.SMTP, int] = {}
+    
+    def acquire(self) -> smtplib.SMTP:
+        """
+        Get a logged-in connection, reusing an idle one when it is still alive.
+        
+        Blocks while max_size connections are already in use.
+        
+        Returns:
+            SMTP connection that must be handed back with release()
+        """
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                if self._is_alive(conn):
+                    return conn
+                self._close(conn)
+        except Exception:
+            self._slots.release()
+            raise
+    
+    def release(self, conn: smtplib.SMTP, discard: bool = False) -> None:
+        """
+        Return a connection to the pool after one message was sent on it.
+        
+        Args:
+            conn: Connection obtained from acquire()
+            discard: Close the connection instead of keeping it (e.g. after an error)
+        """
+        try:
+            sent = self._sent_counts.get(conn, 0) + 1
+            if discard or sent >= self.max_messages_per_conn:
+                self._close(conn)
+            else:
+                self._sent_counts[conn] = sent
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+    
+    def _connect(self) -> smtplib.SMTP:
+        """
+        Open and authenticate a new connection.
+        
+        Returns:
+            Logged-in SMTP connection
+        """
+        conn = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        try:
+            conn.ehlo()
+            conn.starttls()
+            conn.login(self.user, self.password)
+        except Exception:
+            conn.close()
+            raise
+        logger.info(f"Opened SMTP connection to {self.host}:{self.port}")
+        return conn
+    
+    @staticmethod
+    def _is_alive(conn: smtplib.SMTP) -> bool:
+        """
+        Check with a NOOP whether the server has not dropped an idle connection.
+        
+        Args:
+            conn: Idle SMTP connection
+            
+        Returns:
+            True if the connection can still be used
+        """
+        try:
+            return conn.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+    
+    def _close(self, conn: smtplib.SMTP) -> None:
+        """
+        Close a connection and forget its message count.
+        
+        Args:
+            conn: SMTP connection to close
+        """
+        self._sent_counts.pop(conn, None)
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
+
+
+_smtp_pools: Dict[Tuple[str, int, str], SMTPPool] = {}
+_smtp_pools_lock = threading.Lock()
+
+
+def get_smtp_pool(user: str, password: str, host: str = SMTP_HOST, port: int = SMTP_PORT) -> SMTPPool:
+    """
+    Get the process-wide SMTP pool for a server and login.
+    
+    Args:
+        user: Login user name
+        password: Login password
+        host: SMTP server host
+        port: SMTP server port
+        
+    Returns:
+        Shared SMTPPool instance
+    """
+    key = (host, port, user)
+    with _smtp_pools_lock:
+        pool = _smtp_pools.get(key)
+        if pool is None or pool.password != password:
+            pool = _smtp_pools[key] = SMTPPool(host, port, user, password)
+        return pool
+
+
+# Exa client shared by every newsletter; None when no API key is configured
+_EXA_API_KEY = os.getenv('EXA_API_KEY')
+_EXA_CLIENT = Exa(_EXA_API_KEY) if _EXA_API_KEY else None
+
+_search_cache: "OrderedDict[Tuple[str, int], Tuple[float, List[Any]]]" = OrderedDict()
+_search_cache_lock = threading.Lock()
+
+
+def _get_cached_search(key: Tuple[str, int]) -> Optional[List[Any]]:
+    """
+    Look up a recent Exa response for a search.
+    
+    Args:
+        key: Normalized query and number of results
+        
+    Returns:
+        Cached search results, or None if missing or expired
+    """
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, results = entry
+        if time.monotonic() - stored_at > SEARCH_CACHE_TTL:
+            del _search_cache[key]
+            return None
+        _search_cache.move_to_end(key)
+        return results
+
+
+def _cache_search(key: Tuple[str, int], results: List[Any]) -> None:
+    """
+    Store an Exa response, evicting the least recently used entry when full.
+    
+    Args:
+        key: Normalized query and number of results
+        results: Search results returned by Exa
+    """
+    with _search_cache_lock:
+        _search_cache[key] = (time.monotonic(), results)
+        _search_cache.move_to_end(key)
+        while len(_search_cache) > SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+
 
 class ExaNewsletter:
     """
@@ -31,13 +365,31 @@ class ExaNewsletter:
             recipient_emails: Email address(es) to send the newsletter to
             num_results: Number of search results to include
         """
-        load_dotenv()
         # Enhance the query to get more informative results
         self.query = self._enhance_query(query)
         self.recipient_emails = recipient_emails if isinstance(recipient_emails, list) else [recipient_emails]
         self.num_results = num_results
         self.temp_dir = tempfile.mkdtemp()
         self.items = []
+        # Fallback favicon URLs by domain, shared by all results of this newsletter
+        self._favicon_cache: Dict[str, str] = {}
+        
+        # Optional persistent image cache shared between runs
+        self.image_cache_dir = os.getenv('IMAGE_CACHE_DIR')
+        if self.image_cache_dir:
+            os.makedirs(self.image_cache_dir, exist_ok=True)
+        
+        # Shared session so image downloads reuse pooled TCP/TLS connections
+        self._http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504))
+        )
+        self._http.mount('https://', adapter)
+        self._http.mount('http://', adapter)
+        # Leave Connection at the keep-alive default so sockets stay pooled per host
+        self._http.headers['User-Agent'] = USER_AGENT
         
     def _enhance_query(self, query: str) -> str:
         """
@@ -57,24 +409,21 @@ class ExaNewsletter:
     @staticmethod
     def _strip_html(text: Optional[str]) -> str:
         """
-        Remove HTML tags from text.
+        Remove HTML tags from text and decode its character references.
         
         Args:
             text: Text that may contain HTML tags
             
         Returns:
-            Clean text without HTML tags
+            Clean plain text, ready to be escaped once when rendered
         """
         if not text:
             return ''
             
-        # Remove HTML tags
-        clean_text = re.sub('<[^<]+?>', '', text)
-        
-        # Remove excessive whitespace
-        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-        
-        return clean_text
+        # Remove HTML tags in one regex pass and decode entities such as &amp;
+        # so rendering doesn't escape them twice, then collapse and trim
+        # whitespace with str.split/join instead of a second regex pass
+        return ' '.join(html.unescape(_HTML_TAG_RE.sub('', text)).split())
     
     @staticmethod
     def _create_summary(text: str, max_sentences: int = 5) -> str:
@@ -92,17 +441,18 @@ class ExaNewsletter:
             return 'Click the source link to learn more about this topic.'
             
         # Check if the text is a loading screen or verification message
-        if re.search(r'please wait|being verified|loading', text.lower()):
+        if _LOADING_RE.search(text):
             # Extract any useful information from the title or URL if available
-            title_match = re.search(r'about\s+([^\.]+)', text.lower())
+            title_match = _ABOUT_RE.search(text)
             if title_match:
                 topic = title_match.group(1).strip()
                 return f"This article discusses {topic}. The content appears to be relevant to the search topic. Click the source link to access the full information."
             else:
                 return f"This article contains relevant information to the search topic. Click the source link to access the complete content."
             
-        # Split by sentence endings and rejoin limited number
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        # Split by sentence endings and rejoin limited number; stop splitting
+        # once enough sentences are found instead of splitting the whole text
+        sentences = _SENTENCE_END_RE.split(text, maxsplit=max_sentences)
         summary = ' '.join(sentences[:max_sentences])
         
         # Ensure proper ending
@@ -125,29 +475,29 @@ class ExaNewsletter:
         if not text:
             return ''
             
-        # Convert *text* to <strong>text</strong> (bold)
-        text = re.sub(r'\*([^*]+)\*', r'<strong>\1</strong>', text)
-        
-        # Convert _text_ to <em>text</em> (italics)
-        text = re.sub(r'_([^_]+)_', r'<em>\1</em>', text)
-        
-        # Convert `code` to <code>code</code>
-        text = re.sub(r'`([^`]+)`', r'<code>\1</code>', text)
-        
-        return text
+        # Convert *text*, _text_ and `code` to <strong>, <em> and <code> in one pass
+        return _MARKDOWN_RE.sub(_markdown_to_html, text)
     
     def search_exa(self) -> None:
         """
         Search for content using Exa API and process the results.
+        
+        Identical searches (same normalized query and result count) within
+        SEARCH_CACHE_TTL reuse the previous Exa response instead of
+        repeating the livecrawl.
         """
-        exa_api_key = os.getenv('EXA_API_KEY')
-        if not exa_api_key:
+        cache_key = (' '.join(self.query.lower().split()), self.num_results)
+        results = _get_cached_search(cache_key)
+        if results is not None:
+            logger.info(f"Using cached search results for: {self.query}")
+            self._process_search_results(results)
+            return
+        
+        if _EXA_CLIENT is None:
             raise RuntimeError("EXA_API_KEY not found in environment or .env file")
-            
-        exa = Exa(exa_api_key)
         
         # Configure search parameters for better results
-        results = exa.search_and_contents(
+        response = _EXA_CLIENT.search_and_contents(
             self.query,
             type="auto",
             livecrawl="always",
@@ -166,101 +516,245 @@ class ExaNewsletter:
             num_results=self.num_results
         )
         
-        self._process_search_results(results.results)
+        if response.results:
+            _cache_search(cache_key, response.results)
+        self._process_search_results(response.results)
     
     def _process_search_results(self, results: List[Any]) -> None:
         """
         Process search results and extract relevant information.
         
+        Image downloads are network-bound, so each one is handed to a thread
+        pool as soon as its result has been parsed and overlaps with the
+        processing of the remaining results.
+        
         Args:
             results: List of search result objects
         """
-        for idx, result in enumerate(results):
-            # Extract basic information
-            url = getattr(result, 'url', None)
-            title = getattr(result, 'title', url or 'Untitled')
-            
-            # Get text content and strip HTML if present
-            text_content = getattr(result, 'text', '')
-            snippet = self._strip_html(text_content)
-            
-            # Get summary and ensure HTML is stripped
-            summary = getattr(result, 'summary', '')
-            if summary:
-                summary = self._strip_html(summary)
-            
-            # Generate summary from available content
-            summary_short = (
-                self._create_summary(summary) if summary 
-                else self._create_summary(snippet) if snippet 
-                else f'Information about {title}. Click the source link to learn more.'
-            )
-            
-            # Process markdown in summary (convert *text* to <strong>text</strong>)
-            summary_short = self._process_markdown(summary_short)
-            
-            # Handle favicon
-            favicon = getattr(result, 'favicon', None)
-            # Use a default favicon if none is provided or if it's invalid
-            if not favicon or not favicon.startswith(('http://', 'https://')):
-                # Extract domain from URL to use for favicon service
-                domain = None
-                if url:
-                    domain_match = re.search(r'https?://(?:www\.)?([^/]+)', url)
-                    if domain_match:
-                        domain = domain_match.group(1)
+        items = []
+        downloads = []
+        # One download per distinct URL; items sharing an image share the future
+        futures_by_url = {}
+        seen_sources = set()
+        # Threads are started lazily, so small result sets only spawn what they use
+        with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+            for idx, result in enumerate(results):
+                # Exa can return the same page more than once; keep the first card only
+                source = getattr(result, 'url', None)
+                if source:
+                    if source in seen_sources:
+                        logger.debug("Skipping duplicate result #%d: %s", idx + 1, source)
+                        continue
+                    seen_sources.add(source)
                 
-                # Use Google's favicon service as a fallback
-                if domain:
-                    favicon = f"https://www.google.com/s2/favicons?domain={domain}&sz=64"
-                else:
-                    favicon = 'cid:default-favicon'
+                item = self._result_to_item(idx, result)
+                items.append(item)
+                image_url = item['image_url']
+                if image_url:
+                    if image_url not in futures_by_url:
+                        futures_by_url[image_url] = executor.submit(self.download_image, image_url)
+                    downloads.append((item, futures_by_url[image_url]))
             
-            # Handle image - try different possible attributes
-            image_url = getattr(result, 'image', None)
-            if not image_url:
-                images = getattr(result, 'images', None) or getattr(result, 'image_urls', None)
-                image_url = images[0] if images and isinstance(images, list) and len(images) > 0 else None
+            for item, future in downloads:
+                item['image'] = future.result()
+        
+        # The image tag depends on whether the download succeeded, so build it last
+        for item in items:
+            item['image_html'] = self._image_html(item)
+        
+        # Replace rather than extend so repeated searches do not duplicate items
+        self.items = items
+    
+    def _result_to_item(self, idx: int, result: Any) -> Dict[str, Any]:
+        """
+        Extract the newsletter fields from a single search result.
+        
+        Args:
+            idx: Position of the result in the search response
+            result: Search result object
             
-            # Log the result for debugging
-            logger.info(f"Result #{idx+1}: {title} - {url}")
+        Returns:
+            Newsletter item without a downloaded image
+        """
+        # Extract basic information
+        url = getattr(result, 'url', None)
+        title = getattr(result, 'title', None) or url or 'Untitled'
+        
+        # Get text content and strip HTML if present
+        text_content = getattr(result, 'text', '')
+        snippet = self._strip_html(text_content)
+        
+        # Get summary and ensure HTML is stripped
+        summary = getattr(result, 'summary', '')
+        if summary:
+            summary = self._strip_html(summary)
+        
+        # Generate summary from available content
+        summary_short = (
+            self._create_summary(summary) if summary 
+            else self._create_summary(snippet) if snippet 
+            else f'Information about {title}. Click the source link to learn more.'
+        )
+        
+        # Escape the text, then process markdown (convert *text* to <strong>text</strong>)
+        summary_short = self._process_markdown(html.escape(summary_short))
+        
+        # Handle favicon
+        favicon = getattr(result, 'favicon', None)
+        # Use a default favicon if none is provided or if it's invalid
+        if not favicon or not favicon.startswith(('http://', 'https://')):
+            # Use Google's favicon service for the result's domain as a fallback
+            favicon = self._fallback_favicon(url)
+        
+        # Handle image - try different possible attributes
+        image_url = getattr(result, 'image', None)
+        if not image_url:
+            images = getattr(result, 'images', None) or getattr(result, 'image_urls', None)
+            image_url = images[0] if images and isinstance(images, list) and len(images) > 0 else None
+        
+        # Log the result for debugging
+        logger.debug("Result #%d: %s - %s", idx + 1, title, url)
+        
+        return {
+            'title': title,
+            'excerpt': snippet,
+            'excerpt_preview': snippet[:EXCERPT_PREVIEW_LENGTH] + '...' if len(snippet) > EXCERPT_PREVIEW_LENGTH else snippet,
+            'summary': summary_short,
+            'date': '',
+            'source': url,
+            'image': None,
+            'favicon': favicon,
+            'image_url': image_url
+        }
+    
+    def _fallback_favicon(self, url: Optional[str]) -> str:
+        """
+        Get a favicon URL for a page from Google's favicon service.
+        
+        Results often share a domain, so the URL is built once per domain.
+        
+        Args:
+            url: URL of the page
             
-            # Download image if available
-            image_path = self.download_image(image_url) if image_url else None
+        Returns:
+            Favicon URL, or the default favicon CID if the domain is unknown
+        """
+        domain = self._extract_domain(url)
+        if not domain:
+            return 'cid:default-favicon'
+        favicon = self._favicon_cache.get(domain)
+        if favicon is None:
+            favicon = self._favicon_cache[domain] = f"https://www.google.com/s2/favicons?domain={domain}&sz=64"
+        return favicon
+    
+    @staticmethod
+    def _extract_domain(url: Optional[str]) -> Optional[str]:
+        """
+        Extract the host of an http(s) URL without a leading "www.".
+        
+        Args:
+            url: URL to parse
             
-            # Store processed item
-            self.items.append({
-                'title': title,
-                'excerpt': snippet,
-                'summary': summary_short,
-                'date': '',
-                'source': url,
-                'image': image_path,
-                'favicon': favicon,
-                'image_url': image_url
-            })
+        Returns:
+            Domain name, or None if the URL has no usable host
+        """
+        if not url:
+            return None
+        try:
+            parts = urlsplit(url)
+            host = parts.hostname
+        except ValueError:
+            return None
+        if parts.scheme not in ('http', 'https') or not host:
+            return None
+        return host[4:] if host.startswith('www.') else host
     
     def download_image(self, url: str) -> Optional[str]:
         """
         Download an image from a URL.
         
+        Images are stored under a name derived from the URL, so a URL that was
+        already fetched (in this run, or in a previous run when IMAGE_CACHE_DIR
+        is set) is served from disk without a request.
+        
         Args:
             url: URL of the image to download
             
         Returns:
             Path to the downloaded image or None if download failed
         """
+        image_dir = self.image_cache_dir or self.temp_dir
+        img_path = os.path.join(image_dir, f"{hashlib.sha1(url.encode()).hexdigest()}.jpg")
+        if self._is_cached(img_path):
+            return img_path
+        
+        tmp_path = f"{img_path}.{uuid.uuid4().hex}.part"
         try:
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                img_path = os.path.join(self.temp_dir, f"{uuid.uuid4()}.jpg")
-                with open(img_path, 'wb') as f:
-                    f.write(response.content)
-                return img_path
+            with self._http.get(url, timeout=10, stream=True) as response:
+                if response.status_code == 200:
+                    content_length = response.headers.get('Content-Length', '')
+                    if content_length.isdigit() and int(content_length) > MAX_IMAGE_BYTES:
+                        logger.warning(f"Skipping image larger than {MAX_IMAGE_BYTES} bytes: {url}")
+                        return None
+                    # Write in fixed-size chunks instead of buffering the whole body,
+                    # aborting if the server sends more than the size cap
+                    total = 0
+                    with open(tmp_path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            total += len(chunk)
+                            if total > MAX_IMAGE_BYTES:
+                                raise ValueError(f"Image exceeds {MAX_IMAGE_BYTES} bytes: {url}")
+                            f.write(chunk)
+                    self._downscale_image(tmp_path)
+                    # Rename into place so concurrent readers never see a partial file
+                    os.replace(tmp_path, img_path)
+                    return img_path
         except Exception as e:
             logger.error(f"Error downloading image: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
         return None
     
+    @staticmethod
+    def _downscale_image(path: str) -> None:
+        """
+        Shrink an image in place so it is at most MAX_IMAGE_WIDTH pixels wide.
+        
+        Feed images are often multi-megabyte originals; inline attachments
+        only need to fill the 800px newsletter column. Images that cannot be
+        decoded are left untouched.
+        
+        Args:
+            path: Path to the downloaded image
+        """
+        try:
+            with Image.open(path) as img:
+                if img.width <= MAX_IMAGE_WIDTH or getattr(img, 'is_animated', False):
+                    return
+                img.thumbnail((MAX_IMAGE_WIDTH, img.height), Image.LANCZOS)
+                if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+                    img.save(path, 'PNG', optimize=True)
+                else:
+                    img.convert('RGB').save(path, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+        except Exception as e:
+            logger.warning(f"Could not downscale image {path}: {e}")
+    
+    def _is_cached(self, path: str) -> bool:
+        """
+        Check whether a previously downloaded image can be reused.
+        
+        Args:
+            path: Path where the image would be stored
+            
+        Returns:
+            True if the file exists and, for the persistent cache, is still fresh
+        """
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            return False
+        return self.image_cache_dir is None or age < IMAGE_CACHE_TTL
+    
     def generate_html_newsletter(self) -> str:
         """
         Generate HTML content for the newsletter.
@@ -268,51 +762,56 @@ class ExaNewsletter:
         Returns:
             HTML content as a string
         """
-        html_content = f'''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Curated Newsletter</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; max-width: 800px; margin: 0 auto; padding: 20px; }}
-        h1 {{ color: #333; text-align: center; border-bottom: 2px solid #f0f0f0; padding-bottom: 10px; }}
-        .date {{ color: #666; font-size: 0.9em; text-align: center; margin-bottom: 20px; }}
-        .news-item {{ margin-bottom: 30px; padding: 20px; background: #f9f9f9; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-        .news-item h2 {{ color: #2a5db0; margin-top: 0; }}
-        .news-item .excerpt {{ color: #444; margin: 10px 0; line-height: 1.5; }}
-        .news-item .summary {{ color: #333; margin: 15px 0; background: #f0f0f0; padding: 10px; border-left: 3px solid #2a5db0; }}
-        .news-item .source {{ color: #666; font-size: 0.9em; margin-top: 10px; }}
-        .news-item img {{ max-width: 100%; height: auto; border-radius: 4px; margin: 10px 0; }}
-        .category-header {{ margin: 30px 0 20px; padding: 15px; background: #e9f0f7; border-radius: 8px; text-align: center; }}
-        .category-header h2 {{ color: #333; margin: 0; }}
-        a {{ color: #2a5db0; text-decoration: none; }}
-        a:hover {{ text-decoration: underline; }}
-    </style>
-</head>
-<body>
-    <h1>Curated Newsletter</h1>
-    <div class="date">{datetime.now().strftime('%B %d, %Y')}</div>
-    <div class="category-header">
-        <h2>Today's Insights: {self.query}</h2>
-    </div>
-    {''.join([f'''
-    <div class="news-item">
-        <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 12px;">
-            <div style="display: flex; align-items: center; justify-content: center; width: 24px; height: 24px;">
-                <img src="{item['favicon']}" alt="favicon" style="width: 16px; height: 16px; border-radius: 4px; object-fit: contain; display: block;">
-            </div>
-            <h2 style="margin: 0; font-size: 1.2em; line-height: 1.2;">{item['title']}</h2>
-        </div>
-        <div class="summary">{item['summary']}</div>
-        <p class="excerpt">{item['excerpt'][:300]}{'...' if len(item['excerpt']) > 300 else ''}</p>
-        <div class="source">Source: <a href='{item['source']}' target="_blank">{item['source']}</a></div>
-        {f'<img src="cid:{os.path.basename(item["image"])}" alt="{item["title"]}" style="margin-top: 10px;">' if item.get('image') else (f'<img src="{item["image_url"]}" alt="{item["title"]}" style="margin-top: 10px; max-width:100%; border-radius:4px;">' if item.get('image_url') else '')}
-    </div>
-    ''' for item in self.items])}
-</body>
-</html>
-'''
-        return html_content
+        items_html = ''.join(self._render_item(item) for item in self.items)
+        return _PAGE_TEMPLATE.substitute(
+            date=datetime.now().strftime('%B %d, %Y'),
+            query=html.escape(self.query),
+            items=items_html
+        )
+    
+    @staticmethod
+    def _image_html(item: Dict[str, Any]) -> str:
+        """
+        Build the image tag for an item: the inline attachment if it was
+        downloaded, the remote URL otherwise.
+        
+        Args:
+            item: Processed newsletter item
+            
+        Returns:
+            HTML image tag, or an empty string if the item has no image
+        """
+        title = html.escape(item['title'])
+        if item['image']:
+            return f'<img src="cid:{html.escape(os.path.basename(item["image"]))}" alt="{title}" style="margin-top: 10px;">'
+        if item['image_url']:
+            return f'<img src="{html.escape(item["image_url"])}" alt="{title}" style="margin-top: 10px; max-width:100%; border-radius:4px;">'
+        return ''
+    
+    @staticmethod
+    def _render_item(item: Dict[str, Any]) -> str:
+        """
+        Render a single newsletter item as an HTML card.
+        
+        Text fields are escaped here; the summary is already HTML produced by
+        _process_markdown from escaped text, and image_html is built during
+        processing.
+        
+        Args:
+            item: Processed newsletter item
+            
+        Returns:
+            HTML fragment for the item
+        """
+        source = html.escape(item['source'] or '')
+        return _ITEM_TEMPLATE.format(
+            favicon=html.escape(item['favicon']),
+            title=html.escape(item['title']),
+            summary=item['summary'],
+            excerpt=html.escape(item['excerpt_preview']),
+            source=source,
+            image_html=item['image_html']
+        )
     
     def send_newsletter(self) -> None:
         """
@@ -341,13 +840,16 @@ class ExaNewsletter:
         # Attach images
         self._attach_images_to_email(msg)
         
-        # Send email
+        # Send email over a pooled connection
+        pool = get_smtp_pool(sender_email, sender_password)
         try:
-            with smtplib.SMTP('smtp.gmail.com', 587) as server:
-                server.ehlo()
-                server.starttls()
-                server.login(sender_email, sender_password)
-                server.sendmail(sender_email, recipient_emails, msg.as_string())
+            server = pool.acquire()
+            try:
+                server.send_message(msg, sender_email, recipient_emails)
+            except Exception:
+                pool.release(server, discard=True)
+                raise
+            pool.release(server)
             logger.info(f"Newsletter sent to {recipient_emails}")
         except Exception as e:
             logger.error(f"Failed to send email: {e}")
@@ -360,28 +862,65 @@ class ExaNewsletter:
         Args:
             msg: Email message object
         """
+        attached = set()
         for item in self.items:
-            if item.get('image'):
+            # Items that share an image reference the same Content-ID, so attach it once
+            if item.get('image') and item['image'] not in attached:
+                attached.add(item['image'])
                 try:
                     with open(item['image'], 'rb') as img:
                         img_data = img.read()
+                    # Sniff the type from the header bytes only, not the whole image
+                    kind = filetype.guess(img_data[:IMAGE_SNIFF_BYTES])
+                    if kind is None or not kind.mime.startswith('image/'):
+                        logger.warning(f"Skipping attachment with unrecognized image type: {item['image']}")
+                        continue
                     img_cid = os.path.basename(item['image'])
-                    img_mime = MIMEImage(img_data)
+                    img_mime = MIMEImage(img_data, _subtype=kind.mime.split('/', 1)[1])
                     img_mime.add_header('Content-ID', f'<{img_cid}>')
                     img_mime.add_header('Content-Disposition', 'inline', filename=img_cid)
                     msg.attach(img_mime)
                 except Exception as e:
                     logger.error(f"Error attaching image: {e}")
     
+    def _prune_image_cache(self) -> None:
+        """
+        Delete images in IMAGE_CACHE_DIR that are older than IMAGE_CACHE_TTL.
+        
+        Only files named by download_image are touched, so other files in a
+        shared directory are left alone.
+        """
+        now = time.time()
+        removed = 0
+        try:
+            with os.scandir(self.image_cache_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not _CACHED_IMAGE_RE.match(entry.name):
+                        continue
+                    try:
+                        if now - entry.stat().st_mtime >= IMAGE_CACHE_TTL:
+                            os.remove(entry.path)
+                            removed += 1
+                    except OSError:
+                        # Already removed or replaced by a concurrent run
+                        pass
+        except OSError as e:
+            logger.error(f"Error pruning image cache {self.image_cache_dir}: {e}")
+            return
+        if removed:
+            logger.info(f"Removed {removed} stale images from {self.image_cache_dir}")
+    
     def cleanup(self) -> None:
         """
-        Clean up temporary files and directories.
+        Clean up temporary files and directories and release pooled connections.
+        
+        When IMAGE_CACHE_DIR is set, stale cached images are deleted as well.
         """
+        self._http.close()
+        if self.image_cache_dir:
+            self._prune_image_cache()
         try:
-            for root, dirs, files in os.walk(self.temp_dir):
-                for file in files:
-                    os.remove(os.path.join(root, file))
-            os.rmdir(self.temp_dir)
+            shutil.rmtree(self.temp_dir)
             logger.info(f"Cleaned up temporary directory: {self.temp_dir}")
         except Exception as e:
             logger.error(f"Error during cleanup: {e}")
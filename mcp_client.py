@@ -2,6 +2,8 @@ import os
 import re
 import requests
 import argparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -10,6 +12,22 @@ load_dotenv()
 # Default server URL
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8000/generate_and_send_newsletter")
 
+# (connect, read) timeout in seconds for requests to the MCP server
+MCP_TIMEOUT = (3.05, 30)
+
+# Shared session so repeated requests reuse pooled connections
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(total=2, backoff_factor=0.2))
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
+
+# Prompt parsing patterns, compiled once at import
+_TOPIC_RE = re.compile(r'(?:about|on|for|regarding)\s+([^"]*?)(?:\s+to\s+|\s+with\s+|$)', re.IGNORECASE)
+_GENERAL_RE = re.compile(r'newsletter\s+([^@\s]+(?:\s+[^@\s]+)*?)(?:\s+to\s+|$)', re.IGNORECASE)
+_EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+_COMMAND_WORDS_RE = re.compile(r'\b(?:send|create|make|generate|newsletter|to|with|about|on|for|regarding)\b', re.IGNORECASE)
+_RESULTS_RE = re.compile(r'(?:with|using|include)\s+(\d+)\s+(?:results|articles)', re.IGNORECASE)
+
 def parse_input(user_input):
     """
     Parse a single user input string to extract query, emails, and number of results.
@@ -29,36 +47,35 @@ def parse_input(user_input):
     
     # Extract query (topic) - improved pattern
     # First try the standard pattern
-    topic_match = re.search(r'(?:about|on|for|regarding)\s+([^"]*?)(?:\s+to\s+|\s+with\s+|$)', user_input, re.IGNORECASE)
+    topic_match = _TOPIC_RE.search(user_input)
     if topic_match:
         query = topic_match.group(1).strip()
     
     # If no match, try a more general approach
     if not query:
         # Look for text between "newsletter" and "to" or end of string
-        general_match = re.search(r'newsletter\s+([^@\s]+(?:\s+[^@\s]+)*?)(?:\s+to\s+|$)', user_input, re.IGNORECASE)
+        general_match = _GENERAL_RE.search(user_input)
         if general_match:
             query = general_match.group(1).strip()
             
     # If still no match, try to extract any substantial text
     if not query:
         # Remove email addresses from the input
-        cleaned_input = re.sub(r'[\w\.-]+@[\w\.-]+\.\w+', '', user_input)
+        cleaned_input = _EMAIL_RE.sub('', user_input)
         # Remove common command words
-        cleaned_input = re.sub(r'\b(?:send|create|make|generate|newsletter|to|with|about|on|for|regarding)\b', '', cleaned_input, flags=re.IGNORECASE)
+        cleaned_input = _COMMAND_WORDS_RE.sub('', cleaned_input)
         # Get the longest remaining phrase
         words = [w for w in cleaned_input.split() if len(w) > 2]
         if words:
             query = ' '.join(words)
     
     # Extract emails
-    email_pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
-    emails = re.findall(email_pattern, user_input)
+    emails = _EMAIL_RE.findall(user_input)
     if emails:
         email_list = emails
     
     # Extract number of results
-    results_match = re.search(r'(?:with|using|include)\s+(\d+)\s+(?:results|articles)', user_input, re.IGNORECASE)
+    results_match = _RESULTS_RE.search(user_input)
     if results_match:
         try:
             num_results = int(results_match.group(1))
@@ -101,7 +118,7 @@ def main():
     
     # Send the request
     try:
-        resp = requests.post(MCP_SERVER_URL, json=payload)
+        resp = _SESSION.post(MCP_SERVER_URL, json=payload, timeout=MCP_TIMEOUT)
         resp.raise_for_status()
         print(resp.json().get("status", resp.text))
     except Exception as e:
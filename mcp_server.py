@@ -14,11 +14,18 @@ class NewsletterRequest(BaseModel):
     emails: List[str]
     num_results: int = 5
 
+def build_and_send_newsletter(newsletter: ExaNewsletter) -> None:
+    # Runs after the response is sent; cleanup happens even if search or send fails
+    try:
+        newsletter.search_exa()
+        newsletter.send_newsletter()
+    finally:
+        newsletter.cleanup()
+
 @app.post("/generate_and_send_newsletter")
-def generate_and_send_newsletter(req: NewsletterRequest, background_tasks: BackgroundTasks):
+async def generate_and_send_newsletter(req: NewsletterRequest, background_tasks: BackgroundTasks):
+    # Nothing here blocks, so the handler runs on the event loop; the sync
+    # background task is dispatched to Starlette's threadpool after the response
     newsletter = ExaNewsletter(req.query, req.emails, req.num_results)
-    newsletter.search_exa()
-    background_tasks.add_task(newsletter.send_newsletter)
-    background_tasks.add_task(newsletter.cleanup)
-    return {"status": f"Newsletter is being sent to {req.emails}"}
-
+    background_tasks.add_task(build_and_send_newsletter, newsletter)
+    return {"status": f"Newsletter is being generated and sent to {req.emails}"}
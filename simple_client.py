@@ -2,25 +2,191 @@ import os
 import re
 import json
 import requests
+import sys
 import argparse
 import logging
-from typing import Tuple, List, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Tuple, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
+# Default server URL, overridden by the MCP_SERVER_URL environment variable
+MCP_SERVER_URL = "http://localhost:8000/generate_and_send_newsletter"
 
-# Default server URL
-MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8000/generate_and_send_newsletter")
+# (connect, read) timeout in seconds for requests to the MCP server
+MCP_TIMEOUT = (3.05, 30)
+
+# Shared session so the Groq and MCP requests reuse pooled connections;
+# connect errors and gateway errors are retried with backoff, POSTs
+# included. Read errors are not retried, since the server may already have
+# queued the newsletter and a resend would email it twice
+_SESSION = requests.Session()
+_RETRY = Retry(total=3, read=0, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=['POST'])
+_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=_RETRY)
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
+
+# Maximum number of parsed prompts kept in the Groq result cache
+GROQ_CACHE_SIZE = 256
+
+# Maximum number of prompts handled concurrently in batch mode
+MAX_BATCH_WORKERS = 8
+
+# Maximum number of prompts parsed by a single Groq call in batch mode
+GROQ_BATCH_SIZE = 16
+
+# Groq chat completions endpoint and model
+GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_MODEL = "llama3-70b-8192"
+
+# Prompt parsing patterns, compiled once at import
+# Topic keywords, strongest first: in "for the sales team on Kubernetes" the
+# topic follows "on", not "for"
+_TOPIC_RES = tuple(
+    re.compile(rf'\b(?:{keywords})\b\s+([^"]*?)(?:\s+to\s+|$)', re.IGNORECASE)
+    for keywords in ('about|regarding', 'on', 'for')
+)
+_GENERAL_RE = re.compile(r'\bnewsletter\b\s+(?:about\s+)?(.+?)(?:\s+to\s+|\s+with\s+|$)', re.IGNORECASE)
+_EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+_RESULTS_RE = re.compile(r'(?:with|using|include)\s+(\d+)\s+(?:results|articles)', re.IGNORECASE)
+
+# Groq prompt around the user input, built once rather than per call
+_GROQ_PROMPT_PREFIX = """
+    Extract the newsletter topic and email addresses from the following user input:
+    
+    \""""
+_GROQ_PROMPT_SUFFIX = """"
+    
+    Return ONLY a JSON object with the following format:
+    {
+        "topic": "the extracted topic",
+        "emails": ["email1@example.com", "email2@example.com"]
+    }
+    
+    If no topic is found, set "topic" to null.
+    If no emails are found, set "emails" to an empty array.
+    """
+
+# Groq prompt around a numbered list of user inputs in batch mode
+_GROQ_BATCH_PROMPT_PREFIX = """
+    Extract the newsletter topic and email addresses from each of the following numbered user inputs:
+    
+"""
+_GROQ_BATCH_PROMPT_SUFFIX = """
+    Return ONLY a JSON array with one object per input, in the same order, each with the following format:
+    {
+        "topic": "the extracted topic",
+        "emails": ["email1@example.com", "email2@example.com"]
+    }
+    
+    If no topic is found for an input, set its "topic" to null.
+    If no emails are found for an input, set its "emails" to an empty array.
+    """
+
+# Decoder used to pull the JSON object out of Groq replies
+_JSON_DECODER = json.JSONDecoder()
+
+# Successful Groq parses keyed on the normalized prompt, oldest first
+_groq_cache: "OrderedDict[str, Tuple[Optional[str], List[str]]]" = OrderedDict()
+_groq_cache_lock = threading.Lock()
+
+def _groq_complete(groq_api_key: str, prompt: str, max_tokens: int) -> Optional[str]:
+    """
+    Send a single-message chat completion request to Groq.
+    
+    Args:
+        groq_api_key: Groq API key
+        prompt: The user message
+        max_tokens: Upper bound on the reply length
+        
+    Returns:
+        The reply text, or None if the response had no choices
+    """
+    headers = {
+        "Authorization": f"Bearer {groq_api_key}",
+        "Content-Type": "application/json"
+    }
+    payload = {
+        "model": GROQ_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": max_tokens
+    }
+    
+    response = _SESSION.post(GROQ_API_URL, headers=headers, json=payload, timeout=10)
+    response.raise_for_status()
+    
+    result = response.json()
+    if "choices" in result and len(result["choices"]) > 0:
+        return result["choices"][0]["message"]["content"]
+    return None
+
+def _groq_cache_key(user_input: str) -> str:
+    """Normalize a prompt so repeats differing only in case or spacing share a cache entry."""
+    return ' '.join(user_input.lower().split())
+
+def _clean_topic(topic: Any) -> Optional[str]:
+    """
+    Validate a topic returned by Groq.
+    
+    Args:
+        topic: The "topic" value as received
+        
+    Returns:
+        The stripped topic, or None unless it is a non-blank string
+    """
+    if isinstance(topic, str) and topic.strip():
+        return topic.strip()
+    return None
+
+def _normalize_emails(emails: Any) -> List[str]:
+    """
+    Validate an email list from Groq or a JSON request body.
+    
+    Addresses are pulled out of each string item with _EMAIL_RE, so a
+    comma-separated string (the format main() asks for) yields one entry
+    per address and text without an address yields none. Non-string items
+    are dropped. Addresses are lower-cased and repeats removed, keeping
+    the first occurrence, so each recipient gets one copy.
+    
+    Args:
+        emails: The "emails" value as received, a list or a single string
+        
+    Returns:
+        Unique, lower-cased addresses in their original order
+    """
+    if isinstance(emails, str):
+        emails = [emails]
+    if not isinstance(emails, list):
+        return []
+    return list(dict.fromkeys(
+        address.lower()
+        for item in emails if isinstance(item, str)
+        for address in _EMAIL_RE.findall(item)
+    ))
+
+def _cache_groq_result(cache_key: str, topic: Optional[str], emails: List[str]) -> None:
+    """Store a successful Groq parse, evicting the oldest entries past GROQ_CACHE_SIZE."""
+    if topic or emails:
+        with _groq_cache_lock:
+            _groq_cache[cache_key] = (topic, emails)
+            _groq_cache.move_to_end(cache_key)
+            while len(_groq_cache) > GROQ_CACHE_SIZE:
+                _groq_cache.popitem(last=False)
 
 def parse_with_groq(user_input: str) -> Tuple[Optional[str], List[str]]:
     """
     Use Groq API to parse the user input and extract the topic and emails.
     
+    Successful parses are cached in memory, so repeating a prompt in the
+    same process does not call the API again.
+    
     Args:
         user_input: The user's input string
         
@@ -32,58 +198,117 @@ def parse_with_groq(user_input: str) -> Tuple[Optional[str], List[str]]:
         logger.warning("GROQ_API_KEY not found in environment variables")
         return None, []
     
-    # Prepare the API request
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {groq_api_key}",
-        "Content-Type": "application/json"
-    }
+    # Identical prompts (ignoring case and spacing) reuse the earlier parse
+    cache_key = _groq_cache_key(user_input)
+    with _groq_cache_lock:
+        cached = _groq_cache.get(cache_key)
+        if cached is not None:
+            _groq_cache.move_to_end(cache_key)
+            return cached
     
     # Create a prompt that asks the model to extract information
-    prompt = f"""
-    Extract the newsletter topic and email addresses from the following user input:
+    prompt = _GROQ_PROMPT_PREFIX + user_input + _GROQ_PROMPT_SUFFIX
     
-    "{user_input}"
+    try:
+        content = _groq_complete(groq_api_key, prompt, 1024)
+        if content is not None:
+            # Decode the first JSON object in the response, ignoring any
+            # prose the model adds before or after it
+            start = content.find('{')
+            if start != -1:
+                data, _ = _JSON_DECODER.raw_decode(content, start)
+                
+                topic = _clean_topic(data.get("topic"))
+                emails = _normalize_emails(data.get("emails", []))
+                
+                _cache_groq_result(cache_key, topic, emails)
+                
+                return topic, emails
     
-    Return ONLY a JSON object with the following format:
-    {{
-        "topic": "the extracted topic",
-        "emails": ["email1@example.com", "email2@example.com"]
-    }}
+    except Exception as e:
+        logger.error("Error using Groq API: %s", e)
     
-    If no topic is found, set "topic" to null.
-    If no emails are found, set "emails" to an empty array.
+    return None, []
+
+def _match_topic(user_input: str, log: bool = True) -> Optional[str]:
     """
+    Extract the topic with the keyword patterns, then the general one.
     
-    payload = {
-        "model": "llama3-70b-8192",
-        "messages": [{"role": "user", "content": prompt}],
-        "max_tokens": 1024
-    }
+    A match containing an '@' swallowed a recipient address rather than
+    naming a topic, so it counts as a miss.
     
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-        response.raise_for_status()
+    Args:
+        user_input: The user's input string
+        log: Whether to log which pattern matched
         
-        result = response.json()
-        if "choices" in result and len(result["choices"]) > 0:
-            content = result["choices"][0]["message"]["content"]
-            
-            # Extract the JSON part from the response
-            json_match = re.search(r'({.*})', content, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-                data = json.loads(json_str)
-                
-                topic = data.get("topic")
-                emails = data.get("emails", [])
-                
-                return topic, emails
+    Returns:
+        The topic, or None if neither pattern found one
+    """
+    patterns = [(pattern, "regex") for pattern in _TOPIC_RES] + [(_GENERAL_RE, "general regex")]
+    for pattern, label in patterns:
+        match = pattern.search(user_input)
+        if match:
+            topic = match.group(1).strip()
+            if topic and '@' not in topic:
+                if log:
+                    logger.info("Topic extracted with %s: %s", label, topic)
+                return topic
+    return None
+
+def _parse_with_groq_safely(user_input: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Run parse_with_groq, logging instead of raising on failure.
     
+    Args:
+        user_input: The user's input string
+        
+    Returns:
+        A tuple containing (topic, list of emails)
+    """
+    try:
+        query, emails = parse_with_groq(user_input)
+        if query:
+            logger.info("Topic extracted with Groq API: %s", query)
+        return query, emails
     except Exception as e:
-        logger.error(f"Error using Groq API: {e}")
+        logger.warning("Error using Groq API to parse input: %s", e)
+        return None, []
+
+def _parse_json_request(data: dict) -> Tuple[Optional[str], List[str], int]:
+    """
+    Read query, emails and num_results from a JSON request body.
     
-    return None, []
+    Fields with the wrong type are ignored with a warning instead of
+    sending the body through free-text parsing, which would lose the
+    fields that are valid.
+    
+    Args:
+        data: The decoded JSON object
+        
+    Returns:
+        tuple: (query, email_list, num_results)
+    """
+    query = data.get('query')
+    if query is not None and not isinstance(query, str):
+        logger.warning("Ignoring non-string 'query' in JSON request: %r", query)
+        query = None
+    
+    emails = data.get('emails')
+    if emails is not None and not isinstance(emails, (list, str)):
+        logger.warning("Ignoring 'emails' in JSON request, expected a list of addresses: %r", emails)
+        emails = None
+    
+    num_results = data.get('num_results')
+    if num_results is None:
+        num_results = 5
+    else:
+        try:
+            num_results = int(num_results)
+        except (TypeError, ValueError):
+            logger.warning("Ignoring invalid 'num_results' in JSON request: %r", num_results)
+            num_results = 5
+    
+    return query, _normalize_emails(emails), num_results
 
 def parse_input(user_input):
     """
@@ -91,51 +316,57 @@ def parse_input(user_input):
     
     Format: "Send a newsletter about [TOPIC] to [EMAIL1, EMAIL2, ...] with [N] results"
     
+    A JSON object with the server's query, emails and num_results fields is
+    also accepted and returned directly.
+    
+    The regex patterns run first and Groq is only consulted when they miss
+    the topic or the emails. Set ALWAYS_USE_GROQ=1 to parse with Groq first.
+    
     Args:
         user_input: The user's input string
         
     Returns:
         tuple: (query, email_list, num_results)
     """
+    # A JSON request body is used as-is, skipping regex and Groq parsing
+    stripped = user_input.lstrip()
+    if stripped.startswith('{'):
+        try:
+            data = json.loads(stripped)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            return _parse_json_request(data)
+    
     # Default values
     query = None
     email_list = []
     num_results = 5
+    emails = []
     
-    # Try to use Groq API to parse the user input
-    try:
-        query, emails = parse_with_groq(user_input)
-        if query:
-            logger.info(f"Topic extracted with Groq API: {query}")
-    except Exception as e:
-        logger.warning(f"Error using Groq API to parse input: {e}")
-        query = None
-        emails = []
+    # When forced, let Groq parse first and use regex only to fill gaps
+    always_use_groq = os.getenv('ALWAYS_USE_GROQ') == '1'
+    if always_use_groq:
+        query, emails = _parse_with_groq_safely(user_input)
     
-    # Fallback to regex if Groq API failed or returned no results
     if not query:
-        # Extract query (topic)
-        topic_match = re.search(r'(?:about|on|for|regarding)\s+([^"]*?)(?:\s+to\s+|$)', user_input, re.IGNORECASE)
-        if topic_match:
-            query = topic_match.group(1).strip()
-            logger.info(f"Topic extracted with regex: {query}")
+        query = _match_topic(user_input)
+    
+    # Prompts without an '@' cannot contain an address, so skip the scan
+    if not emails and '@' in user_input:
+        emails = _EMAIL_RE.findall(user_input)
+    
+    # Only pay for the Groq round-trip when the regex parse is incomplete
+    if not always_use_groq and (not query or not emails):
+        groq_query, groq_emails = _parse_with_groq_safely(user_input)
+        query = query or groq_query
+        emails = emails or groq_emails
     
-    # If still no topic, try more general patterns
-    if not query:
-        general_match = re.search(r'newsletter\s+(?:about\s+)?(.+?)(?:\s+to\s+|\s+with\s+|$)', user_input, re.IGNORECASE)
-        if general_match:
-            query = general_match.group(1).strip()
-            logger.info(f"Topic extracted with general regex: {query}")
-    
-    # If no emails were found by Groq, use regex
-    if not emails:
-        email_pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
-        emails = re.findall(email_pattern, user_input)
     if emails:
-        email_list = emails
+        email_list = _normalize_emails(emails)
     
     # Extract number of results
-    results_match = re.search(r'(?:with|using|include)\s+(\d+)\s+(?:results|articles)', user_input, re.IGNORECASE)
+    results_match = _RESULTS_RE.search(user_input)
     if results_match:
         try:
             num_results = int(results_match.group(1))
@@ -144,12 +375,178 @@ def parse_input(user_input):
     
     return query, email_list, num_results
 
+def _needs_groq(user_input: str) -> bool:
+    """
+    Cheaply predict whether parse_input will ask Groq about a prompt.
+    
+    Args:
+        user_input: The user's input string
+        
+    Returns:
+        True unless the prompt is a JSON body or regex finds both parts
+    """
+    if user_input.lstrip().startswith('{'):
+        return False
+    if os.getenv('ALWAYS_USE_GROQ') == '1':
+        return True
+    has_topic = _match_topic(user_input, log=False)
+    has_email = '@' in user_input and _EMAIL_RE.search(user_input)
+    return not (has_topic and has_email)
+
+def _prefetch_groq_batch(inputs: List[str]) -> None:
+    """
+    Parse several prompts with one Groq call and cache the results.
+    
+    Prompts that come back malformed, or whose entry lists an address not
+    found in that prompt, stay uncached, so parse_input falls back to
+    parsing them one at a time.
+    
+    Args:
+        inputs: Prompts to parse together
+    """
+    groq_api_key = os.getenv('GROQ_API_KEY')
+    if not groq_api_key:
+        return
+    
+    numbered = ''.join(f'    {i}. "{user_input}"\n' for i, user_input in enumerate(inputs, 1))
+    prompt = _GROQ_BATCH_PROMPT_PREFIX + numbered + _GROQ_BATCH_PROMPT_SUFFIX
+    
+    try:
+        content = _groq_complete(groq_api_key, prompt, 256 * len(inputs))
+        start = content.find('[') if content is not None else -1
+        if start == -1:
+            logger.warning("Groq batch reply had no JSON array; parsing prompts individually")
+            return
+        data, _ = _JSON_DECODER.raw_decode(content, start)
+        if not isinstance(data, list) or len(data) != len(inputs):
+            logger.warning("Groq batch reply did not match the %d prompts; parsing prompts individually", len(inputs))
+            return
+        for user_input, item in zip(inputs, data):
+            if not isinstance(item, dict):
+                continue
+            emails = _normalize_emails(item.get("emails", []))
+            # An entry whose addresses don't appear in its own prompt was
+            # shifted or merged by the model; leave that prompt uncached
+            prompt_text = user_input.lower()
+            if any(email not in prompt_text for email in emails):
+                logger.warning("Groq batch entry does not match its prompt; parsing it individually")
+                continue
+            _cache_groq_result(_groq_cache_key(user_input), _clean_topic(item.get("topic")), emails)
+    except Exception as e:
+        logger.warning("Error using Groq API to parse batch: %s", e)
+
+def parse_batch(inputs: List[str]) -> List[Tuple[Optional[str], List[str], int]]:
+    """
+    Parse many prompts, sharing Groq round-trips between them.
+    
+    Prompts the regex patterns cannot fully parse are sent to Groq together,
+    GROQ_BATCH_SIZE per request, instead of one request each.
+    
+    Args:
+        inputs: The user's input strings
+        
+    Returns:
+        One (query, email_list, num_results) tuple per input, in order
+    """
+    pending = []
+    seen = set()
+    for user_input in inputs:
+        cache_key = _groq_cache_key(user_input)
+        if cache_key not in seen and cache_key not in _groq_cache and _needs_groq(user_input):
+            seen.add(cache_key)
+            pending.append(user_input)
+    
+    # A single pending prompt gains nothing from the batch prompt
+    if len(pending) > 1:
+        for i in range(0, len(pending), GROQ_BATCH_SIZE):
+            _prefetch_groq_batch(pending[i:i + GROQ_BATCH_SIZE])
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_BATCH_WORKERS, len(inputs)))) as executor:
+        return list(executor.map(parse_input, inputs))
+
+def send_request(query: str, email_list: List[str], num_results: int) -> str:
+    """
+    Post a newsletter request to the MCP server.
+    
+    Args:
+        query: The newsletter topic
+        email_list: Recipient email addresses
+        num_results: Number of articles to include
+        
+    Returns:
+        The status message returned by the server
+    """
+    payload = {
+        "query": query,
+        "emails": email_list,
+        "num_results": num_results
+    }
+    server_url = os.getenv("MCP_SERVER_URL", MCP_SERVER_URL)
+    resp = _SESSION.post(server_url, json=payload, timeout=MCP_TIMEOUT)
+    resp.raise_for_status()
+    return resp.json().get("status", resp.text)
+
+def process_prompt(query: Optional[str], email_list: List[str], num_results: int) -> str:
+    """
+    Send one parsed prompt to the MCP server without asking for input.
+    
+    Args:
+        query: The newsletter topic, if one was found
+        email_list: Recipient email addresses
+        num_results: Number of articles to include
+        
+    Returns:
+        A one-line result for the prompt
+    """
+    if not query:
+        return "Skipped: topic not detected"
+    if not email_list:
+        return "Skipped: no email addresses detected"
+    try:
+        return send_request(query, email_list, num_results)
+    except Exception as e:
+        return f"Failed to send request: {e}"
+
+def run_batch(path: str) -> None:
+    """
+    Send one newsletter per non-empty line of a prompts file.
+    
+    Prompts are parsed with parse_batch and then posted concurrently over the
+    shared session, so the MCP round-trips of different prompts overlap.
+    
+    Args:
+        path: File with one prompt per line, or '-' to read from stdin
+    """
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    prompts = [line.strip() for line in lines if line.strip()]
+    if not prompts:
+        print("No prompts found")
+        return
+    
+    parsed = parse_batch(prompts)
+    with ThreadPoolExecutor(max_workers=min(MAX_BATCH_WORKERS, len(prompts))) as executor:
+        for prompt, status in zip(prompts, executor.map(lambda args: process_prompt(*args), parsed)):
+            print(f"{prompt}\n  {status}")
+
 def main():
+    # Load environment variables; library users who import this module
+    # supply their own environment and skip reading .env
+    load_dotenv()
+    
     parser = argparse.ArgumentParser(description='Generate and send a newsletter with a single command')
     parser.add_argument('prompt', nargs='?', help='A prompt like "Send a newsletter about AI advancements to user@example.com with 6 results"')
+    parser.add_argument('--batch', metavar='FILE', help="Send one newsletter per line of FILE ('-' for stdin)")
     
     args = parser.parse_args()
     
+    if args.batch:
+        run_batch(args.batch)
+        return
+    
     if args.prompt:
         user_input = args.prompt
     else:
@@ -165,22 +562,13 @@ def main():
         emails = input("No email addresses detected. Please enter recipient emails (comma separated): ")
         email_list = [e.strip() for e in emails.split(',') if e.strip()]
     
-    # Prepare the payload
-    payload = {
-        "query": query,
-        "emails": email_list,
-        "num_results": num_results
-    }
-    
     print(f"\nGenerating newsletter about: {query}")
     print(f"Sending to: {', '.join(email_list)}")
     print(f"Including {num_results} results")
     
     # Send the request
     try:
-        resp = requests.post(MCP_SERVER_URL, json=payload)
-        resp.raise_for_status()
-        print(resp.json().get("status", resp.text))
+        print(send_request(query, email_list, num_results))
     except Exception as e:
         print(f"Failed to send request: {e}")
 
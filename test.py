@@ -1,15 +1,17 @@
 import os
+import sys
 from dotenv import load_dotenv
 
 load_dotenv()
 exa_api_key = os.getenv('EXA_API_KEY')
 
 from exa_py import Exa
-exa = Exa('exa_api_key')
 
-results = exa.search_and_contents(
-    "AI blogs", 
-    text=False
-)
+# One client for every query so its HTTP connections are reused
+_EXA = Exa(exa_api_key)
 
-print(results)
\ No newline at end of file
+def search(q):
+    return _EXA.search_and_contents(q, text=False)
+
+for query in sys.argv[1:] or ["AI blogs"]:
+    print(search(query))